@@ -1,18 +1,24 @@
 from datetime import datetime, timezone
-import json
+import logging
 import os
 import os.path
 import shutil
-from typing import TextIO, Optional, Iterable, List
-from urllib.parse import urlparse
+from typing import Callable, TextIO, Optional, Iterable, List
 from itertools import chain
 
 import pystac
 import pystac.layout
 import pystac.link
 import pystac.utils
-from slugify import slugify
-from .mystac import STACObject, normpath, make_absolute_hrefs
+from .mystac import (
+    BuildContext,
+    STACObject,
+    normpath,
+    is_remote_href,
+    make_absolute_hrefs,
+    read_json,
+    write_json,
+)
 
 # from .iso import generate_product_metadata, generate_project_metadata
 from .origcsv import (
@@ -23,6 +29,7 @@ from .origcsv import (
     load_orig_eo_missions,
 )
 from .metrics import caclulate_metrics
+from .util import clone_file
 from .stac import (
     PROJECT_PROP,
     MISSIONS_PROP,
@@ -37,8 +44,12 @@ from .stac import (
     get_theme_id,
     get_variable_id,
     get_eo_mission_id,
+    get_project_id,
+    get_product_id,
 )
 
+logger = logging.getLogger(__name__)
+
 # to fix https://github.com/stac-utils/pystac/issues/1112
 if "related" not in pystac.link.HIERARCHICAL_LINKS:
     pystac.link.HIERARCHICAL_LINKS.append("related")
@@ -108,35 +119,26 @@ def convert_csvs(
     root.add_child(eo_missions_catalog)
     root.add_child(products_catalog)
 
-    themes_catalog.add_children(
-        sorted(
-            (catalog_from_theme(theme) for theme in themes),
-            key=lambda catalog: catalog.id,
-        )
-    )
+    # sort the records by their resulting IDs, so that the children don't
+    # need to be created before sorting them
+    themes.sort(key=lambda theme: get_theme_id(theme.name))
+    variables.sort(key=lambda variable: get_variable_id(variable.name))
+    eo_missions.sort(key=lambda eo_mission: get_eo_mission_id(eo_mission.name))
+    projects.sort(key=lambda project: get_project_id(project.id))
+    products.sort(key=lambda product: get_product_id(product.id))
+
+    themes_catalog.add_children(catalog_from_theme(theme) for theme in themes)
     variables_catalog.add_children(
-        sorted(
-            (catalog_from_variable(variable) for variable in variables),
-            key=lambda catalog: catalog.id,
-        )
+        catalog_from_variable(variable) for variable in variables
     )
     eo_missions_catalog.add_children(
-        sorted(
-            (catalog_from_eo_mission(eo_mission) for eo_mission in eo_missions),
-            key=lambda catalog: catalog.id,
-        )
+        catalog_from_eo_mission(eo_mission) for eo_mission in eo_missions
     )
     projects_catalog.add_children(
-        sorted(
-            (collection_from_project(project) for project in projects),
-            key=lambda collection: collection.id,
-        )
+        collection_from_project(project) for project in projects
     )
     products_catalog.add_children(
-        sorted(
-            (collection_from_product(product) for product in products),
-            key=lambda collection: collection.id,
-        )
+        collection_from_product(product) for product in products
     )
 
     # save catalog
@@ -156,67 +158,148 @@ def convert_csvs(
                 )
 
 
-def validate_project(
-    collection: pystac.Collection, themes: set[str]
-) -> list[str]:
+def validate_project(collection: dict, themes: set[str]) -> list[str]:
     errors = []
-    for theme in collection.extra_fields[THEMES_PROP]:
-        if theme not in themes:
+    for theme in collection.get(THEMES_PROP, []):
+        if get_theme_id(theme) not in themes:
             errors.append(f"Theme '{theme}' not valid")
     return errors
 
 
 def validate_product(
-    collection: pystac.Collection,
+    collection: dict,
     themes: set[str],
     variables: set[str],
     eo_missions: set[str],
 ) -> list[str]:
     errors = []
-    variable = collection.extra_fields[VARIABLES_PROP]
-    if variable not in variables:
-        errors.append(f"Variable '{variable}' not valid")
-    for theme in collection.extra_fields[THEMES_PROP]:
-        if theme not in themes:
+    for variable in collection.get(VARIABLES_PROP, []):
+        if get_variable_id(variable) not in variables:
+            errors.append(f"Variable '{variable}' not valid")
+    for theme in collection.get(THEMES_PROP, []):
+        if get_theme_id(theme) not in themes:
             errors.append(f"Theme '{theme}' not valid")
-    for eo_mission in collection.extra_fields[MISSIONS_PROP]:
-        if eo_mission not in eo_missions:
+    for eo_mission in collection.get(MISSIONS_PROP, []):
+        if get_eo_mission_id(eo_mission) not in eo_missions:
             errors.append(f"EO Mission '{eo_mission}' not valid")
     return errors
 
 
-def validate_catalog(data_dir: str):
-    root: pystac.Collection = pystac.read_file(
-        os.path.join(data_dir, "collection.json")
-    )
-    assets = root.get_assets()
-    with open(os.path.join(data_dir, assets["themes"].href)) as f:
-        themes = {theme["name"] for theme in json.load(f)}
-    with open(os.path.join(data_dir, assets["variables"].href)) as f:
-        variables = {variable["name"] for variable in json.load(f)}
-    with open(os.path.join(data_dir, assets["eo-missions"].href)) as f:
-        eo_missions = {eo_mission["name"] for eo_mission in json.load(f)}
+def validate_catalog(data_dir: str) -> list[tuple[str, list[str]]]:
+    # the layout created by `convert_csvs` is known, so the files are located
+    # directly and read as plain JSON, without building a pystac tree
+    def get_paths(catalog_id: str, filename: str) -> List[str]:
+        with os.scandir(os.path.join(data_dir, catalog_id)) as entries:
+            paths = (
+                os.path.join(entry.path, filename)
+                for entry in entries
+                if entry.is_dir()
+            )
+            return sorted(path for path in paths if os.path.isfile(path))
+
+    def get_ids(catalog_id: str) -> set[str]:
+        return {
+            os.path.basename(os.path.dirname(path))
+            for path in get_paths(catalog_id, "catalog.json")
+        }
+
+    themes = get_ids("themes")
+    variables = get_ids("variables")
+    eo_missions = get_ids("eo-missions")
 
     validation_errors = []
 
-    for project_collection in root.get_children():
-        ret = validate_project(project_collection, themes)
+    for path in get_paths("projects", "collection.json"):
+        collection = read_json(path)
+        ret = validate_project(collection, themes)
         if ret:
-            validation_errors.append((project_collection, ret))
-        for product_collection in project_collection.get_children():
-            ret = validate_product(
-                product_collection, themes, variables, eo_missions
-            )
-            if ret:
-                validation_errors.append((product_collection, ret))
+            validation_errors.append((collection["id"], ret))
+
+    for path in get_paths("products", "collection.json"):
+        collection = read_json(path)
+        ret = validate_product(collection, themes, variables, eo_missions)
+        if ret:
+            validation_errors.append((collection["id"], ret))
 
     from pprint import pprint
 
     pprint(validation_errors)
     # TODO: raise Exception if validation_errors
+    return validation_errors
+
+
+def cache_mtimes(directory: str) -> dict[str, float]:
+    """Collects the modification times of all JSON files beneath the given
+    directory in a single walk with `os.scandir`, so that the recursive
+    catalog traversal can look them up.
+
+    The times are taken from the directory entries. On Windows, these already
+    include them, so no file needs its own `stat`. On POSIX systems, each file
+    is still `stat`ed once, as without the cache.
+
+    Args:
+        directory (str): the root directory of the catalog
+
+    Returns:
+        dict[str, float]: the modification times, keyed by absolute path
+    """
+    mtimes = {}
+    directories = [os.path.abspath(directory)]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    mtimes[entry.path] = entry.stat().st_mtime
+    return mtimes
+
+
+def get_mtime(path: str, mtimes: Optional[dict[str, float]] = None) -> float:
+    """Returns the modification time of the given file, preferably from the
+    `mtimes` collected by `cache_mtimes`.
+
+    Args:
+        path (str): the path of the file
+        mtimes (Optional[dict[str, float]]): the cached modification times
+
+    Returns:
+        float: the modification time as a POSIX timestamp
+    """
+    mtime = mtimes.get(os.path.abspath(path)) if mtimes else None
+    if mtime is not None:
+        return mtime
+    return os.path.getmtime(path)
+
+
+def update_item_timestamp(
+    item_path: str, mtimes: Optional[dict[str, float]] = None
+) -> datetime:
+    """Sets the `updated` property of the STAC Item at the given path to the
+    modification time of its file.
+
+    Args:
+        item_path (str): the path of the STAC Item
+        mtimes (Optional[dict[str, float]]): the cached modification times
+
+    Returns:
+        datetime: the resulting timestamp
+    """
+    item_updated = datetime.fromtimestamp(
+        get_mtime(item_path, mtimes), tz=timezone.utc
+    )
+    item = STACObject.from_file(item_path)
+    # only rewrite the item when its timestamp is actually outdated
+    if item.set_updated(item_updated, properties=True):
+        item.save()
+    return item_updated
 
 
-def set_update_timestamps(path: str, catalog: STACObject) -> Optional[datetime]:
+def set_update_timestamps(
+    path: str,
+    catalog: STACObject,
+    mtimes: Optional[dict[str, float]] = None,
+) -> Optional[datetime]:
     """Updates the `updated` field in the catalog according to the underlying
     files last modification time and its included Items and children. This also
     updates the included STAC Items `updated` property respectively.
@@ -230,46 +313,41 @@ def set_update_timestamps(path: str, catalog: STACObject) -> Optional[datetime]:
         - the modification time of the catalog file itself
 
     Args:
+        path (str): the path of the catalog file
         catalog (pystac.Catalog): the catalog to update the timestamp for
+        mtimes (Optional[dict[str, float]]): the modification times from
+            `cache_mtimes`, looked up instead of the file system
 
     Returns:
         Optional[datetime]: the resulting timestamp
     """
 
-    if urlparse(path).scheme not in ("", "file"):
+    if is_remote_href(path):
         return None
 
-    updated = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+    updated = datetime.fromtimestamp(get_mtime(path, mtimes), tz=timezone.utc)
 
     for link in catalog.get_links("child"):
-        child_href = link["href"]
         # only follow relative links
-        if urlparse(child_href).scheme not in ("", "file"):
+        if is_remote_href(link["href"]):
             continue
 
-        child_path = normpath(path, child_href)
+        child_path = normpath(path, link["href"])
         child = STACObject.from_file(child_path)
-
-        child_updated = set_update_timestamps(child_path, child)
+        child_updated = set_update_timestamps(child_path, child, mtimes)
         if child_updated:
             updated = max(updated, child_updated)
 
     for link in catalog.get_links("item"):
-        item_href = link["href"]
-        if urlparse(item_href).scheme not in ("", "file"):
+        if is_remote_href(link["href"]):
             continue
 
-        item_path = normpath(path, item_href)
-        item_updated = datetime.fromtimestamp(
-            os.path.getmtime(item_path), tz=timezone.utc
+        item_updated = update_item_timestamp(
+            normpath(path, link["href"]), mtimes
         )
-        item = STACObject.from_file(item_path)
-        item.set_updated(item_updated, properties=True)
-        item.save()
         updated = max(updated, item_updated)
 
-    if updated:
-        catalog.set_updated(updated)
+    if updated and catalog.set_updated(updated):
         catalog.save()
 
     return updated
@@ -281,116 +359,95 @@ def link_collections(
     theme_catalogs: Iterable[STACObject],
     variable_catalogs: Iterable[STACObject],
     eo_mission_catalogs: Iterable[STACObject],
+    apply_keywords_fn: Optional[Callable[[STACObject], None]] = None,
 ):
-    themes_map: dict[str, STACObject] = {
-        catalog["id"]: catalog for catalog in theme_catalogs
-    }
-    variables_map: dict[str, STACObject] = {
-        catalog["id"]: catalog for catalog in variable_catalogs
-    }
-    eo_missions_map: dict[str, STACObject] = {
-        catalog["id"]: catalog for catalog in eo_mission_catalogs
-    }
-    project_map: dict[str, STACObject] = {
-        collection["id"]: collection for collection in project_collections
-    }
+    # the link targets along with the titles of links pointing to them
+    def get_targets(
+        catalogs: Iterable[STACObject], label: str
+    ) -> dict[str, tuple[STACObject, str]]:
+        return {
+            catalog["id"]: (catalog, f"{label}: {catalog['title']}")
+            for catalog in catalogs
+        }
+
+    themes_map = get_targets(theme_catalogs, "Theme")
+    variables_map = get_targets(variable_catalogs, "Variable")
+    eo_missions_map = get_targets(eo_mission_catalogs, "EO Mission")
+    project_map = get_targets(project_collections, "Project")
 
     # link variable -> themes
     for variable_catalog in variable_catalogs:
         for theme_name in variable_catalog.get(THEMES_PROP, []):
-            theme = themes_map[get_theme_id(theme_name)]
-            variable_catalog.add_object_link(
-                theme,
-                rel="related",
-                title=f"Theme: {theme['title']}",
-            )
+            theme, title = themes_map[get_theme_id(theme_name)]
+            variable_catalog.add_object_link(theme, rel="related", title=title)
+        if apply_keywords_fn:
+            apply_keywords_fn(variable_catalog)
 
     # link projects -> themes
     for project_collection in project_collections:
         for theme_name in project_collection.get(THEMES_PROP, []):
-            theme = themes_map[get_theme_id(theme_name)]
+            theme, title = themes_map[get_theme_id(theme_name)]
             project_collection.add_object_link(
-                theme,
-                rel="related",
-                title=f"Theme: {theme['title']}",
+                theme, rel="related", title=title
             )
 
     # link products
     for product_collection in product_collections:
-        # product -> project
-        project_collection = project_map[
-            slugify(product_collection[PROJECT_PROP])
+        # product -> project, themes, variables and eo missions
+        link_ops = [
+            project_map[get_project_id(product_collection[PROJECT_PROP])],
+            *(
+                themes_map[get_theme_id(name)]
+                for name in product_collection.get(THEMES_PROP, [])
+            ),
+            *(
+                variables_map[get_variable_id(name)]
+                for name in product_collection.get(VARIABLES_PROP, [])
+            ),
+            *(
+                eo_missions_map[get_eo_mission_id(name)]
+                for name in product_collection.get(MISSIONS_PROP, [])
+            ),
         ]
-        print(f"Linking {product_collection['id']} -> {project_collection['id']}")
-        product_collection.add_object_link(
-            project_collection,
-            rel="related",
-            title=f"Project: {project_collection['title']}",
-        )
-        project_collection.add_object_link(
-            product_collection,
-            rel="child",
-            title=f"Product: {product_collection['title']}",
-        )
 
-        # product -> themes
-        for theme_name in product_collection.get(THEMES_PROP, []):
-            theme = themes_map[get_theme_id(theme_name)]
-            print(f"Linking {product_collection['id']} -> {theme['id']}")
-            product_collection.add_object_link(
-                theme,
-                rel="related",
-                title=f"Theme: {theme['title']}",
+        product_title = f"Product: {product_collection['title']}"
+        for target, title in link_ops:
+            logger.debug(
+                "Linking %s -> %s", product_collection["id"], target["id"]
             )
-            theme.add_object_link(
-                product_collection,
-                rel="child",
-                title=f"Product: {product_collection['title']}",
-            )
-
-        # product -> variables
-        for variable_name in product_collection.get(VARIABLES_PROP, []):
-            variable = variables_map[get_variable_id(variable_name)]
-            print(f"Linking {product_collection['id']} -> {variable['id']}")
             product_collection.add_object_link(
-                variable,
-                rel="related",
-                title=f"Variable: {variable['title']}",
+                target, rel="related", title=title
             )
-            variable.add_object_link(
-                product_collection,
-                rel="child",
-                title=f"Product: {product_collection['title']}",
+            target.add_object_link(
+                product_collection, rel="child", title=product_title
             )
 
-        # product -> eo mission
-        for eo_mission_name in product_collection.get(MISSIONS_PROP, []):
-            eo_mission = eo_missions_map[get_eo_mission_id(eo_mission_name)]
-            print(f"Linking {product_collection['id']} -> {eo_mission['id']}")
-            product_collection.add_object_link(
-                eo_mission,
-                rel="related",
-                title=f"EO Mission: {eo_mission['title']}",
-            )
-            eo_mission.add_object_link(
-                product_collection,
-                rel="child",
-                title=f"Product: {product_collection['title']}",
-            )
+        if apply_keywords_fn:
+            apply_keywords_fn(product_collection)
+
+    if apply_keywords_fn:
+        # these only receive their last links from the products above
+        for catalog in chain(
+            project_collections, theme_catalogs, eo_mission_catalogs
+        ):
+            apply_keywords_fn(catalog)
+
+
+KEYWORD_PROPS = frozenset(
+    [THEMES_PROP, VARIABLES_PROP, MISSIONS_PROP, REGION_PROP, PROJECT_PROP]
+)
 
 
 def apply_keywords(catalog: STACObject):
+    # skip catalogs without any keyword relevant properties early on
+    if not KEYWORD_PROPS & catalog.keys():
+        return
+
     keywords = catalog.get("keywords", [])
-    keywords.extend(
-        f"theme:{name}" for name in catalog.get(THEMES_PROP, [])
-    )
-    keywords.extend(
-        f"variable:{name}"
-        for name in catalog.get(VARIABLES_PROP, [])
-    )
-    keywords.extend(
-        f"mission:{name}"
-        for name in catalog.get(MISSIONS_PROP, [])
+    keywords += (
+        [f"theme:{name}" for name in catalog.get(THEMES_PROP, [])]
+        + [f"variable:{name}" for name in catalog.get(VARIABLES_PROP, [])]
+        + [f"mission:{name}" for name in catalog.get(MISSIONS_PROP, [])]
     )
     if region := catalog.get(REGION_PROP):
         keywords.append(f"region:{region}")
@@ -411,42 +468,57 @@ def build_dist(
     shutil.copytree(
         data_dir,
         out_dir,
+        copy_function=clone_file,
     )
+    finalize_dist(out_dir, root_href, pretty_print, update_timestamps)
+
+
+def finalize_dist(
+    out_dir: str,
+    root_href: str,
+    pretty_print: bool = True,
+    update_timestamps: bool = True,
+):
+    """Turns the converted catalog in `out_dir` into the final one, in place.
+    This links the collections, sets the keywords and makes all hrefs
+    absolute, relative to `root_href`.
+    """
     root_path = os.path.join(out_dir, "catalog.json")
-    root = STACObject.from_file(root_path)
-
-    if update_timestamps:
-        set_update_timestamps(root_path, root)
-
-    products = list(root.get_child("products").get_children())
-    projects = list(root.get_child("projects").get_children())
-    themes = list(root.get_child("themes").get_children())
-    variables = list(root.get_child("variables").get_children())
-    eo_missions = list(root.get_child("eo-missions").get_children())
-
-    link_collections(
-        products,
-        projects,
-        themes,
-        variables,
-        eo_missions,
-    )
 
-    indent = 2 if pretty_print else None
+    # all phases below share the parsed files, which are written at the end
+    with BuildContext():
+        root = STACObject.from_file(root_path)
+
+        if update_timestamps:
+            mtimes = cache_mtimes(out_dir)
+            set_update_timestamps(root_path, root, mtimes)
+
+        products, projects, themes, variables, eo_missions = (
+            list(root.get_child(catalog_id).get_children())
+            for catalog_id in (
+                "products",
+                "projects",
+                "themes",
+                "variables",
+                "eo-missions",
+            )
+        )
 
-    # Apply keywords
-    catalogs = chain(
-        products,
-        projects,
-        themes,
-        variables,
-        eo_missions,
-    )
-    for catalog in catalogs:
-        apply_keywords(catalog)
-        catalog.save(indent=indent)
+        link_collections(
+            products,
+            projects,
+            themes,
+            variables,
+            eo_missions,
+            apply_keywords,
+        )
 
-    make_absolute_hrefs(root, root_href, "catalog.json", indent)
+        # this saves every catalog reachable from the root, including the
+        # ones modified above, each of which is only written once, when the
+        # context is left
+        make_absolute_hrefs(
+            root, root_href, "catalog.json", 2 if pretty_print else None
+        )
 
 
 def build_metrics(
@@ -461,8 +533,11 @@ def build_metrics(
 
     metrics = caclulate_metrics("OSC-Catalog", root)
 
-    with open(os.path.join(data_dir, metrics_file_name), "w") as f:
-        json.dump(metrics, f, indent=2 if pretty_print else None)
+    write_json(
+        os.path.join(data_dir, metrics_file_name),
+        metrics,
+        2 if pretty_print else None,
+    )
 
     if add_to_root:
         root.add_link(
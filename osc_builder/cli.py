@@ -2,7 +2,13 @@ from typing import TextIO
 
 import click
 
-from .build import convert_csvs, validate_catalog, build_dist, build_metrics
+from .build import (
+    convert_csvs,
+    validate_catalog,
+    build_dist,
+    build_metrics,
+    finalize_dist,
+)
 from . import origcsv
 
 
@@ -15,6 +21,35 @@ def cli(ctx):
 ENCODING = "ISO-8859-1"
 
 
+def print_csv_issues(
+    variables_file: TextIO,
+    themes_file: TextIO,
+    eo_missions_file: TextIO,
+    projects_file: TextIO,
+    products_file: TextIO,
+):
+    print("Validating CSVs...")
+    issues = origcsv.validate_csvs(
+        variables_file,
+        themes_file,
+        eo_missions_file,
+        projects_file,
+        products_file,
+    )
+    if issues:
+        for issue in issues:
+            print(issue)
+        print(f"Found {len(issues)} issues")
+    else:
+        print("No issues found")
+
+    variables_file.seek(0)
+    themes_file.seek(0)
+    eo_missions_file.seek(0)
+    projects_file.seek(0)
+    products_file.seek(0)
+
+
 @cli.command()
 @click.argument("variables_file", type=click.File("r", encoding=ENCODING))
 @click.argument("themes_file", type=click.File("r", encoding=ENCODING))
@@ -33,26 +68,13 @@ def convert(
     validate_csvs: bool,
 ):
     if validate_csvs:
-        print("Validating CSVs...")
-        issues = origcsv.validate_csvs(
+        print_csv_issues(
             variables_file,
             themes_file,
             eo_missions_file,
             projects_file,
             products_file,
         )
-        if issues:
-            for issue in issues:
-                print(issue)
-            print(f"Found {len(issues)} issues")
-        else:
-            print("No issues found")
-
-        variables_file.seek(0)
-        themes_file.seek(0)
-        eo_missions_file.seek(0)
-        projects_file.seek(0)
-        products_file.seek(0)
 
     convert_csvs(
         variables_file,
@@ -92,6 +114,57 @@ def build(
     )
 
 
+@cli.command()
+@click.argument("variables_file", type=click.File("r", encoding=ENCODING))
+@click.argument("themes_file", type=click.File("r", encoding=ENCODING))
+@click.argument("eo_missions_file", type=click.File("r", encoding=ENCODING))
+@click.argument("projects_file", type=click.File("r", encoding=ENCODING))
+@click.argument("products_file", type=click.File("r", encoding=ENCODING))
+@click.option("--out-dir", "-o", default="dist", type=str)
+@click.option("--validate-csvs/--no-validate-csvs", default=True)
+@click.option("--root-href", "-r", default="", type=str)
+@click.option("--pretty-print/--no-pretty-print", default=True)
+@click.option("--update-timestamps/--no-update-timestamps", default=True)
+def convert_and_build(
+    variables_file: TextIO,
+    themes_file: TextIO,
+    eo_missions_file: TextIO,
+    projects_file: TextIO,
+    products_file: TextIO,
+    out_dir: str,
+    validate_csvs: bool,
+    root_href: str,
+    pretty_print: bool,
+    update_timestamps: bool,
+):
+    """Converts the CSVs and builds the catalog from them in one go, without
+    writing and copying an intermediate data directory.
+    """
+    if validate_csvs:
+        print_csv_issues(
+            variables_file,
+            themes_file,
+            eo_missions_file,
+            projects_file,
+            products_file,
+        )
+
+    convert_csvs(
+        variables_file,
+        themes_file,
+        eo_missions_file,
+        projects_file,
+        products_file,
+        out_dir,
+    )
+    finalize_dist(
+        out_dir,
+        root_href,
+        pretty_print,
+        update_timestamps,
+    )
+
+
 @cli.command()
 @click.argument("data_dir", type=str)
 @click.option("--out", "-o", default="metrics.json", type=str)
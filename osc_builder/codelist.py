@@ -1,6 +1,5 @@
-from typing import List
+from typing import List, Optional
 
-from lxml.builder import ElementMaker
 from lxml import etree
 
 from .types import Theme, Variable, EOMission
@@ -14,134 +13,127 @@ nsmap = {
     "xsi": "http://www.w3.org/2001/XMLSchema-instance",
 }
 
-GMX = ElementMaker(namespace=nsmap["gmx"], nsmap=nsmap)
-GML = ElementMaker(namespace=nsmap["gml"], nsmap=nsmap)
-GMD = ElementMaker(namespace=nsmap["gmd"], nsmap=nsmap)
-GCO = ElementMaker(namespace=nsmap["gco"], nsmap=nsmap)
+# qualified names used for every code entry
+GMX_CODE_ENTRY = f"{{{nsmap['gmx']}}}codeEntry"
+GMX_CODE_DEFINITION = f"{{{nsmap['gmx']}}}CodeDefinition"
+GML_ID = f"{{{nsmap['gml']}}}id"
+GML_IDENTIFIER = f"{{{nsmap['gml']}}}identifier"
+GML_DESCRIPTION = f"{{{nsmap['gml']}}}description"
+GML_DESCRIPTION_REFERENCE = f"{{{nsmap['gml']}}}descriptionReference"
+GCO_CHARACTER_STRING = f"{{{nsmap['gco']}}}CharacterString"
+XLINK_TYPE = f"{{{nsmap['xlink']}}}type"
+XLINK_HREF = f"{{{nsmap['xlink']}}}href"
+
+
+def write_element(
+    xf, tag: str, text: Optional[str] = None, attrib: Optional[dict] = None
+):
+    """Writes a single element with an optional text content to the
+    incremental writer `xf`.
+    """
+    with xf.element(tag, attrib):
+        if text is not None:
+            xf.write(text)
+
+
+def write_character_string(xf, tag: str, text: str):
+    with xf.element(tag):
+        write_element(xf, GCO_CHARACTER_STRING, text)
+
+
+def write_code_entry(
+    xf,
+    id: str,
+    description: str,
+    link: Optional[str] = None,
+):
+    with xf.element(GMX_CODE_ENTRY):
+        with xf.element(GMX_CODE_DEFINITION, {GML_ID: id}):
+            write_element(xf, GML_IDENTIFIER, id, {"codeSpace": "OSC"})
+            write_element(xf, GML_DESCRIPTION, description)
+            if link is not None:
+                write_element(
+                    xf,
+                    GML_DESCRIPTION_REFERENCE,
+                    attrib={XLINK_TYPE: "simple", XLINK_HREF: link},
+                )
 
 
 def build_codelists(
     themes: List[Theme],
     variables: List[Variable],
     eo_missions: List[EOMission],
-) -> etree._ElementTree:
-    # create codelists.xml
-    root = GMX(
-        "CT_CodelistCatalogue",
-        GMX("name", GCO("CharacterString", "OSC_Codelists")),
-        GMX(
-            "scope",
-            GCO("CharacterString", "Codelists for Open Science Catalog"),
-        ),
-        GMX(
-            "fieldOfApplication",
-            GCO("CharacterString", "Open Science Catalog")
-        ),
-        GMX("versionNumber", GCO("CharacterString", "1.0.0")),
-        GMX("versionDate", GCO("Date", "2022-02-05")),
-        GMX(
-            "language",
-            GMD(
-                "LanguageCode",
-                "English",
-                codeList="#LanguageCode",
-                codeListValue="eng",
-            ),
-        ),
-        GMX(
-            "characterSet",
-            GMD(
-                "MD_CharacterSetCode",
-                "utf8",
-                codeList="#MD_CharacterSetCode",
-                codeListValue="utf8",
-            ),
-        ),
-        # actual codelists for themes, variables
-        GMX(
-            "codeListItem",
-            *[
-                GMX(
-                    "codeEntry",
-                    GMX(
-                        "CodeDefinition",
-                        GML(
-                            "identifier",
-                            f"OSC_Theme_{theme.name}",
-                            codeSpace="OSC",
-                        ),
-                        GML("description", theme.description),
-                        GML(
-                            "descriptionReference",
-                            **{
-                                f"{{{nsmap['xlink']}}}type": "simple",
-                                f"{{{nsmap['xlink']}}}href": theme.link,
-                            },
-                        ),
-                        **{f"{{{nsmap['gml']}}}id": f"OSC_Theme_{theme.name}"},
-                    ),
-                )
-                for theme in themes
-            ],
-        ),
-        GMX(
-            "codeListItem",
-            *[
-                GMX(
-                    "codeEntry",
-                    GMX(
-                        "CodeDefinition",
-                        GML(
-                            "identifier",
-                            f"OSC_Variable_{variable.name}",
-                            codeSpace="OSC",
-                        ),
-                        GML("description", variable.description),
-                        GML(
-                            "descriptionReference",
-                            **{
-                                f"{{{nsmap['xlink']}}}type": "simple",
-                                f"{{{nsmap['xlink']}}}href": variable.link,
-                            },
-                        ),
-                        **{
-                            f"{{{nsmap['gml']}}}id":
-                                f"OSC_Variable_{variable.name}"
-                        },
-                    ),
+    path: str,
+):
+    """Writes the codelists.xml for the given themes, variables and EO
+    missions to `path`. The file is streamed, so no element tree is built
+    in memory.
+    """
+    with etree.xmlfile(path, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element(
+            f"{{{nsmap['gmx']}}}CT_CodelistCatalogue", nsmap=nsmap
+        ):
+            write_character_string(
+                xf, f"{{{nsmap['gmx']}}}name", "OSC_Codelists"
+            )
+            write_character_string(
+                xf,
+                f"{{{nsmap['gmx']}}}scope",
+                "Codelists for Open Science Catalog",
+            )
+            write_character_string(
+                xf,
+                f"{{{nsmap['gmx']}}}fieldOfApplication",
+                "Open Science Catalog",
+            )
+            write_character_string(
+                xf, f"{{{nsmap['gmx']}}}versionNumber", "1.0.0"
+            )
+            with xf.element(f"{{{nsmap['gmx']}}}versionDate"):
+                write_element(xf, f"{{{nsmap['gco']}}}Date", "2022-02-05")
+            with xf.element(f"{{{nsmap['gmx']}}}language"):
+                write_element(
+                    xf,
+                    f"{{{nsmap['gmd']}}}LanguageCode",
+                    "English",
+                    {"codeList": "#LanguageCode", "codeListValue": "eng"},
                 )
-                for variable in variables
-            ],
-        ),
-        GMX(
-            "codeListItem",
-            *[
-                GMX(
-                    "codeEntry",
-                    GMX(
-                        "CodeDefinition",
-                        GML(
-                            "identifier",
-                            f"OSC_EO_Mission_{eo_mission.name}",
-                            codeSpace="OSC",
-                        ),
-                        GML("description", eo_mission.name),
-                        # GML(
-                        #     "descriptionReference",
-                        #     **{
-                        #         f"{{{nsmap['xlink']}}}type": "simple",
-                        #         f"{{{nsmap['xlink']}}}href": eo_mission.name,
-                        #     },
-                        # ),
-                        **{
-                            f"{{{nsmap['gml']}}}id":
-                                f"OSC_EO_Mission_{eo_mission.name}"
-                        },
-                    ),
+            with xf.element(f"{{{nsmap['gmx']}}}characterSet"):
+                write_element(
+                    xf,
+                    f"{{{nsmap['gmd']}}}MD_CharacterSetCode",
+                    "utf8",
+                    {
+                        "codeList": "#MD_CharacterSetCode",
+                        "codeListValue": "utf8",
+                    },
                 )
-                for eo_mission in eo_missions
-            ],
-        ),
-    )
 
-    return etree.ElementTree(root)
+            # actual codelists for themes, variables
+            with xf.element(f"{{{nsmap['gmx']}}}codeListItem"):
+                for theme in themes:
+                    write_code_entry(
+                        xf,
+                        f"OSC_Theme_{theme.name}",
+                        theme.description,
+                        theme.link,
+                    )
+
+            with xf.element(f"{{{nsmap['gmx']}}}codeListItem"):
+                for variable in variables:
+                    write_code_entry(
+                        xf,
+                        f"OSC_Variable_{variable.name}",
+                        variable.description,
+                        variable.link,
+                    )
+
+            with xf.element(f"{{{nsmap['gmx']}}}codeListItem"):
+                for eo_mission in eo_missions:
+                    # EO missions have no description reference
+                    write_code_entry(
+                        xf,
+                        f"OSC_EO_Mission_{eo_mission.name}",
+                        eo_mission.name,
+                    )
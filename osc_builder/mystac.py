@@ -1,13 +1,20 @@
 import json
 import os.path
-from typing import Any, Optional, Iterable, List
+from typing import Any, Dict, Optional, Iterable, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 
 @dataclass
 class STACObject:
+    # one instance per file of the catalog, so avoid a __dict__ for each
+    __slots__ = ("path", "values")
     path: str
     values: dict
 
@@ -17,6 +24,9 @@ class STACObject:
     def __setitem__(self, key, value):
         self.values[key] = value
 
+    def keys(self):
+        return self.values.keys()
+
     def get(self, *args, **kwargs):
         return self.values.get(*args, **kwargs)
 
@@ -25,10 +35,15 @@ class STACObject:
 
     @classmethod
     def from_file(cls, path):
+        if _context:
+            return _context.load(path)
         return cls(path, read_json(path))
 
-    def save(self, path: Optional[str] = None, indent: int = 2):
-        write_json(path or self.path, self.values, indent)
+    def save(self, path: Optional[str] = None, indent: Optional[int] = 2):
+        if _context:
+            _context.save(self, path or self.path, indent)
+        else:
+            write_json(path or self.path, self.values, indent)
 
     def get_links(self, rel: Optional[str] = None) -> List[dict]:
         links = self.get("links", [])
@@ -36,9 +51,19 @@ class STACObject:
             links = [link for link in links if link.get("rel") == rel]
         return links
 
+    def get_link_paths(self, rel: str) -> List[str]:
+        """Returns the normalized file paths of all links with the given
+        `rel`, resolved against the directory of this object.
+        """
+        # the directory is the same for all links, so only compute it once
+        directory = os.path.dirname(self.path)
+        return [
+            os.path.normpath(os.path.join(directory, link["href"]))
+            for link in self.get_links(rel)
+        ]
+
     def get_children(self) -> Iterable["STACObject"]:
-        for link in self.get_links("child"):
-            yield STACObject.from_file(normpath(self.path, link["href"]))
+        return map(STACObject.from_file, self.get_link_paths("child"))
 
     def get_child(self, id: str) -> Optional["STACObject"]:
         for child in self.get_children():
@@ -47,8 +72,7 @@ class STACObject:
         return None
 
     def get_items(self) -> Iterable["STACObject"]:
-        for link in self.get_links("item"):
-            yield STACObject.from_file(normpath(self.path, link["href"]))
+        return map(STACObject.from_file, self.get_link_paths("item"))
 
     def add_link(self, rel: str, href: str, type: str, **kwargs) -> dict:
         link = {"rel": rel, "href": href, "type": type, **kwargs}
@@ -86,22 +110,84 @@ class STACObject:
         else:
             self.add_link(rel="self", href=href, type="application/json")
 
-    def set_updated(self, dt: datetime, properties: bool = False):
+    def set_updated(self, dt: datetime, properties: bool = False) -> bool:
+        """Sets the `updated` timestamp and returns whether it changed."""
         formatted = dt.isoformat().replace("+00:00", "Z")
-        if properties:
-            self.setdefault("properties", {})["updated"] = formatted
-        else:
-            self["updated"] = formatted
+        target = self.setdefault("properties", {}) if properties else self
+        if target.get("updated") == formatted:
+            return False
+        target["updated"] = formatted
+        return True
+
+
+class BuildContext:
+    """Keeps the parsed STAC files in memory while it is active. Within the
+    context, each file is only read and parsed once, regardless of how many
+    times it is loaded via `STACObject.from_file`, and saving only marks the
+    object as dirty. All dirty objects are written once, when the context is
+    left.
+    """
+
+    def __init__(self):
+        self.docs: Dict[str, STACObject] = {}
+        self.dirty: Dict[str, Tuple[STACObject, Optional[int]]] = {}
+
+    def __enter__(self) -> "BuildContext":
+        global _context
+        _context = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _context
+        _context = None
+        if exc_type is None:
+            self.flush()
+
+    def load(self, path: str) -> STACObject:
+        key = os.path.abspath(path)
+        obj = self.docs.get(key)
+        if obj is None:
+            # setdefault, so concurrent loads of a file share one object
+            obj = self.docs.setdefault(key, STACObject(path, read_json(path)))
+        return obj
+
+    def save(self, obj: STACObject, path: str, indent: Optional[int]):
+        key = os.path.abspath(path)
+        self.docs[key] = obj
+        self.dirty[key] = (obj, indent)
+
+    def flush(self):
+        """Writes all dirty objects."""
+        for path, (obj, indent) in self.dirty.items():
+            write_json(path, obj.values, indent)
+        self.dirty.clear()
+
+
+# the currently active BuildContext, if any
+_context: Optional[BuildContext] = None
 
 
 def read_json(path: str) -> dict:
-    with open(path) as f:
-        return json.load(f)
-
-
-def write_json(path: str, obj: Any, indent: int = 2):
-    with open(path, "w") as f:
-        json.dump(obj, f, indent=indent, ensure_ascii=False, allow_nan=False)
+    # read the whole file at once and parse the bytes, instead of letting
+    # the parser read from the file object
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: str, obj: Any, indent: Optional[int] = 2):
+    # serialize up front, so that the file is written with a single call
+    # orjson only supports two-space indentation
+    if orjson and indent in (None, 2):
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    else:
+        data = json.dumps(
+            obj, indent=indent, ensure_ascii=False, allow_nan=False
+        ).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
 
 
 def get_self_link(obj: dict) -> str:
@@ -118,7 +204,20 @@ def relpath(to: str, from_: str) -> str:
     return os.path.relpath(to, os.path.dirname(from_))
 
 
+def is_remote_href(href: str) -> bool:
+    # a scheme can only come before the first slash, so most relative hrefs
+    # are recognized without the more expensive urlparse
+    if ":" not in href.partition("/")[0]:
+        return False
+    return urlparse(href).scheme not in ("", "file")
+
+
 def is_absolute_href(href: str) -> bool:
+    # shortcut for the common relative hrefs: without a colon there is no
+    # scheme, and a path that does not start with a slash is not absolute.
+    # Hrefs with leading whitespace are left to urlparse, which strips it
+    if ":" not in href and href[:1] > " " and href[0] not in "/\\":
+        return False
     parsed = urlparse(href)
     return parsed.scheme != "" or os.path.isabs(parsed.path)
 
@@ -128,31 +227,21 @@ def make_absolute_hrefs(
 ):
     self_href = urljoin(parent_href, path)
 
-    for child_link in self.get_links("child"):
-        if is_absolute_href(child_link["href"]):
-            continue
-
-        make_absolute_hrefs(
-            STACObject.from_file(normpath(self.path, child_link["href"])),
-            self_href,
-            child_link["href"],
-            indent,
-        )
-
-    for item_link in self.get_links("item"):
-        if is_absolute_href(item_link["href"]):
+    # a single pass over the links: descend into children and items while
+    # their href is still relative, then make the href itself absolute
+    for link in self.get_links():
+        href = link["href"]
+        if is_absolute_href(href):
             continue
 
-        make_absolute_hrefs(
-            STACObject.from_file(normpath(self.path, item_link["href"])),
-            self_href,
-            item_link["href"],
-            indent,
-        )
-
-    for link in self.get_links():
-        if not is_absolute_href(link["href"]):
-            link["href"] = urljoin(self_href, link["href"])
+        if link.get("rel") in ("child", "item"):
+            make_absolute_hrefs(
+                STACObject.from_file(normpath(self.path, href)),
+                self_href,
+                href,
+                indent,
+            )
+        link["href"] = urljoin(self_href, href)
 
     for asset in self.get("assets", {}).values():
         if not is_absolute_href(asset["href"]):
@@ -1,9 +1,16 @@
 from datetime import date, datetime, time, timezone
+from functools import lru_cache
 from typing import List, Literal, TextIO, Union, cast, Optional
 import csv
 import json
+from operator import itemgetter
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 from pygeoif import geometry
 from dateutil.parser import parse as parse_datetime
 from slugify import slugify
@@ -12,6 +19,10 @@ from .types import Contact, Product, Project, Status, Theme, Variable, EOMission
 from .util import parse_decimal_date, get_depth
 
 
+# the last full second of a day, used for the end of date ranges
+END_OF_DAY = time.max.replace(microsecond=0)
+
+
 def get_themes(obj: dict) -> List[str]:
     return [obj[f"Theme{i}"] for i in range(1, 7) if obj[f"Theme{i}"]]
 
@@ -25,7 +36,8 @@ def parse_geometry(source: str) -> geometry._Geometry:
         pass
     else:
         try:
-            raw_geom = json.loads(source)
+            # orjson's errors are ValueErrors as well
+            raw_geom = orjson.loads(source) if orjson else json.loads(source)
             depth = get_depth(raw_geom)
             if depth == 1:
                 geom = geometry.Point(*raw_geom)
@@ -38,6 +50,18 @@ def parse_geometry(source: str) -> geometry._Geometry:
     return geom
 
 
+# the date columns repeat the same few values across many rows, and the
+# parsed dates are immutable, so the date parsers are memoized
+@lru_cache(maxsize=None)
+def parse_iso_date(value: str) -> date:
+    # the dates are usually ISO formatted, which the stdlib parses a lot
+    # faster. Only other formats need the generic parser from dateutil
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return parse_datetime(value).date()
+
+
 def parse_released(value: str) -> Union[date, None, Literal["Planned"]]:
     if not value:
         return None
@@ -45,7 +69,18 @@ def parse_released(value: str) -> Union[date, None, Literal["Planned"]]:
     if value == "Planned":
         return "Planned"
 
-    return parse_datetime(value).date()
+    return parse_iso_date(value)
+
+
+def parse_doi(value: str) -> str:
+    # DOIs are usually given as plain "https://doi.org/<doi>" URLs, which can
+    # be split without urlparse. Anything unusual is still left to urlparse
+    if (
+        value.startswith(("https://", "http://"))
+        and not any(char in value for char in "?#;[]\t\r\n")
+    ):
+        return value.partition("://")[2].partition("/")[2]
+    return urlparse(value).path[1:]
 
 
 def parse_list(value: str, delimiter: str = ";") -> List[str]:
@@ -56,50 +91,130 @@ def parse_list(value: str, delimiter: str = ";") -> List[str]:
     ]
 
 
+@lru_cache(maxsize=None)
 def parse_date(value: str, is_max: bool) -> Optional[datetime]:
     if not value:
         return None
 
     return datetime.combine(
         cast(datetime, parse_decimal_date(value)),
-        time.max.replace(microsecond=0) if is_max else time.min,
+        END_OF_DAY if is_max else time.min,
         timezone.utc,
     )
 
 
+# the columns of the products CSV that are read for every product, in the
+# order in which they are unpacked in `load_orig_products`
+PRODUCT_COLUMNS = (
+    "Short_Name",
+    "Status",
+    "Product",
+    "Description",
+    "Project",
+    "Variable",
+    "Access",
+    "Documentation",
+    "DOI",
+    "Version",
+    "Start",
+    "End",
+    "Polygon",
+    "Region",
+    "Released",
+    "EO_Missions",
+    "Keywords",
+)
+
+
 def load_orig_products(file: TextIO, projects: List[Project]) -> List[Product]:
+    # reversed, so that the first project with a given name takes precedence
+    projects_by_name = {
+        project.name: project for project in reversed(projects)
+    }
+
+    # resolve the column indices once, instead of building a dict per row
+    # and looking up each column by its name
+    reader = csv.reader(file, delimiter=";")
+    header = next(reader, None)
+    # same as csv.DictReader: a file without a header has no products
+    if not header:
+        return []
+
+    indices = {name: index for index, name in enumerate(header)}
+    theme_columns = [f"Theme{i}" for i in range(1, 7)]
+    missing = [
+        name
+        for name in (*PRODUCT_COLUMNS, *theme_columns)
+        if name not in indices
+    ]
+    if missing:
+        raise ValueError(
+            f"Products CSV is missing the column(s): {', '.join(missing)}"
+        )
+
+    get_columns = itemgetter(*(indices[name] for name in PRODUCT_COLUMNS))
+    theme_indices = [indices[name] for name in theme_columns]
+    website_index = indices.get("Website")
+    standard_name_index = indices.get("Standard_Name")
+
     products = []
-    for line in csv.DictReader(file, delimiter=";"):
-        project = None
-        for p in projects:
-            if p.name == line["Project"]:
-                project = p
-                break
-        
+    for row in reader:
+        # skip empty rows and fill missing values, like csv.DictReader, but
+        # with empty strings instead of None
+        if not row:
+            continue
+        if len(row) < len(header):
+            row.extend([""] * (len(header) - len(row)))
+
+        (
+            short_name,
+            status,
+            title,
+            description,
+            project_name,
+            variables,
+            access,
+            documentation,
+            doi,
+            version,
+            start,
+            end,
+            polygon,
+            region,
+            released,
+            eo_missions,
+            keywords,
+        ) = get_columns(row)
         product = Product(
-            id=line["Short_Name"],
-            status=Status(line["Status"].upper()),
-            website=line.get("Website"),
-            title=line["Product"],
-            description=line["Description"],
-            project=project,
-            variables=parse_list(line["Variable"]),
-            themes=get_themes(line),
-            access=line["Access"],
-            documentation=line["Documentation"] or None,
-            doi=urlparse(line["DOI"]).path[1:] if line["DOI"] else None,
-            version=line["Version"] or None,
-            start=parse_date(line["Start"], False),
-            end=parse_date(line["End"], True),
-            geometry=parse_geometry(line["Polygon"]),
-            region=line["Region"] or None,
-            released=parse_released(line["Released"]),
-            eo_missions=parse_list(line["EO_Missions"]),
-            keywords=parse_list(line["Keywords"]),
-            standard_name=line.get("Standard_Name")
+            id=short_name,
+            status=Status(status.upper()),
+            website=(
+                row[website_index] if website_index is not None else None
+            ),
+            title=title,
+            description=description,
+            project=projects_by_name.get(project_name),
+            variables=parse_list(variables),
+            themes=[row[index] for index in theme_indices if row[index]],
+            access=access,
+            documentation=documentation or None,
+            doi=parse_doi(doi) if doi else None,
+            version=version or None,
+            start=parse_date(start, False),
+            end=parse_date(end, True),
+            geometry=parse_geometry(polygon),
+            region=region or None,
+            released=parse_released(released),
+            eo_missions=parse_list(eo_missions),
+            keywords=parse_list(keywords),
+            standard_name=(
+                row[standard_name_index]
+                if standard_name_index is not None
+                else None
+            ),
         )
         products.append(product)
-    
+
     return products
 
 
@@ -115,13 +230,13 @@ def load_orig_projects(file: TextIO) -> List[Project]:
             eo4_society_link=line["Eo4Society_link"],
             consortium=parse_list(line["Consortium"], ","),
             start=datetime.combine(
-                parse_datetime(line["Start_Date_Project"]).date(),
+                parse_iso_date(line["Start_Date_Project"]),
                 time.min,
                 tzinfo=timezone.utc,
             ),
             end=datetime.combine(
-                parse_datetime(line["End_Date_Project"]).date(),
-                time.max.replace(microsecond=0),
+                parse_iso_date(line["End_Date_Project"]),
+                END_OF_DAY,
                 tzinfo=timezone.utc,
             ),
             technical_officer=Contact(
@@ -177,16 +292,15 @@ def validate_csvs(
     projects_file: TextIO,
     products_file: TextIO,
 ) -> List[str]:
-    THEMES = {
-        line["theme"].strip(): line for line in csv.DictReader(themes_file)
-    }
+    # themes and missions are only checked for existence, so only their names
+    # are kept
+    THEMES = {line["theme"].strip() for line in csv.DictReader(themes_file)}
     VARIABLES = {
         line["variable"].strip(): line
         for line in csv.DictReader(variables_file)
     }
     MISSIONS = {
-        line["EO-Mission"].strip(): line
-        for line in csv.DictReader(missions_file)
+        line["EO-Mission"].strip() for line in csv.DictReader(missions_file)
     }
     PROJECTS = {
         line["Project_Name"].strip(): line
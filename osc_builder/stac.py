@@ -1,4 +1,5 @@
 from datetime import date, datetime, time, timezone
+from functools import lru_cache
 from os.path import join
 from typing import Generic, TypeVar, Union, cast, List, Iterable
 from urllib.parse import urlparse
@@ -266,9 +267,8 @@ def collection_from_product(product: Product) -> pystac.Collection:
     Returns:
         pystac.Collection: the created collection
     """
-    slug = slugify(product.id)
     collection = pystac.Collection(
-        slug,
+        get_product_id(product.id),
         product.description,
         extent=pystac.Extent(
             pystac.SpatialExtent([
@@ -293,7 +293,7 @@ def collection_from_product(product: Product) -> pystac.Collection:
 
 def collection_from_project(project: Project) -> pystac.Item:
     collection = pystac.Collection(
-        slugify(project.id),
+        get_project_id(project.id),
         project.description,
         extent=pystac.Extent(
             # todo: ESA should provide this
@@ -377,21 +377,37 @@ def catalog_from_eo_mission(eo_mission: EOMission) -> pystac.Catalog:
     return catalog
 
 
+# the following are called for each reference between catalogs, but with a
+# small set of distinct names, so the slugs are memoized
+
+
+@lru_cache(maxsize=None)
 def get_theme_id(theme_name: str):
     # return f"theme-{slugify(theme_name)}"
     return f"{slugify(theme_name)}"
 
 
+@lru_cache(maxsize=None)
 def get_variable_id(variable_name: str):
     # return f"variable-{slugify(variable_name)}"
     return f"{slugify(variable_name)}"
 
 
+@lru_cache(maxsize=None)
 def get_eo_mission_id(eo_mission_name: str):
     # return f"mission-{slugify(eo_mission_name)}"
     return f"{slugify(eo_mission_name)}"
 
 
+@lru_cache(maxsize=None)
+def get_project_id(project_name: str):
+    return slugify(project_name)
+
+
+def get_product_id(product_name: str):
+    return slugify(product_name)
+
+
 def get_concept_names(catalog: pystac.Catalog, scheme: str):
     for theme in catalog.extra_fields.get("themes", []):
         if theme.get("scheme") == scheme:
@@ -1,10 +1,15 @@
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
+import sys
 from typing import List, Literal, Optional, Union
 
 import pygeoif
 
+# a record is created for each row of the CSVs, so they don't need a
+# __dict__ each. The option is only available from Python 3.10 onwards
+RECORD_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class Status(Enum):
     PLANNED = "PLANNED"
@@ -12,13 +17,13 @@ class Status(Enum):
     COMPLETED = "COMPLETED"
 
 
-@dataclass
+@dataclass(**RECORD_OPTIONS)
 class Contact:
     name: str
     e_mail: str
 
 
-@dataclass
+@dataclass(**RECORD_OPTIONS)
 class Theme:
     name: str
     description: str
@@ -26,7 +31,7 @@ class Theme:
     image: Optional[str] = None
 
 
-@dataclass
+@dataclass(**RECORD_OPTIONS)
 class Project:
     id: str
     status: Status
@@ -42,11 +47,11 @@ class Project:
     themes: List[str]
 
 
-@dataclass
+@dataclass(**RECORD_OPTIONS)
 class Product:
     id: str
     status: Status
-    website: str
+    website: Optional[str]
     title: str
     description: str
     project: Project
@@ -66,7 +71,7 @@ class Product:
     standard_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(**RECORD_OPTIONS)
 class Variable:
     name: str
     description: str
@@ -81,7 +86,7 @@ class Variable:
         return cls(**kwargs)
 
 
-@dataclass
+@dataclass(**RECORD_OPTIONS)
 class EOMission:
     name: str
     description: str
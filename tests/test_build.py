@@ -0,0 +1,56 @@
+import json
+
+from osc_builder.build import validate_catalog
+from osc_builder.stac import MISSIONS_PROP, THEMES_PROP, VARIABLES_PROP
+
+
+def write_json(path, values):
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps(values))
+
+
+def test_validate_catalog(tmp_path):
+    write_json(tmp_path / "themes" / "land" / "catalog.json", {"id": "land"})
+    write_json(
+        tmp_path / "variables" / "albedo" / "catalog.json", {"id": "albedo"}
+    )
+    write_json(
+        tmp_path / "eo-missions" / "sentinel-2" / "catalog.json",
+        {"id": "sentinel-2"},
+    )
+    write_json(
+        tmp_path / "projects" / "good-project" / "collection.json",
+        {"id": "good-project", THEMES_PROP: ["Land"]},
+    )
+    write_json(
+        tmp_path / "projects" / "bad-project" / "collection.json",
+        {"id": "bad-project", THEMES_PROP: ["Land", "Oceans"]},
+    )
+    write_json(
+        tmp_path / "products" / "good-product" / "collection.json",
+        {
+            "id": "good-product",
+            THEMES_PROP: ["Land"],
+            VARIABLES_PROP: ["Albedo"],
+            MISSIONS_PROP: ["Sentinel-2"],
+        },
+    )
+    write_json(
+        tmp_path / "products" / "bad-product" / "collection.json",
+        {
+            "id": "bad-product",
+            THEMES_PROP: ["Land"],
+            VARIABLES_PROP: ["Albedo", "Ozone"],
+            MISSIONS_PROP: ["Landsat"],
+        },
+    )
+    # directories without a catalog file are no entries
+    (tmp_path / "themes" / "oceans").mkdir()
+
+    assert validate_catalog(str(tmp_path)) == [
+        ("bad-project", ["Theme 'Oceans' not valid"]),
+        (
+            "bad-product",
+            ["Variable 'Ozone' not valid", "EO Mission 'Landsat' not valid"],
+        ),
+    ]
@@ -0,0 +1,117 @@
+import json
+import os.path
+from urllib.parse import urlparse
+
+import pytest
+
+from osc_builder.mystac import (
+    BuildContext,
+    STACObject,
+    is_absolute_href,
+    is_remote_href,
+)
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"id": "catalog", "links": []}))
+    return str(path)
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_build_context_loads_once(catalog_path):
+    with BuildContext():
+        first = STACObject.from_file(catalog_path)
+        assert STACObject.from_file(catalog_path) is first
+
+    # outside of the context, each load parses the file again
+    assert STACObject.from_file(catalog_path) is not first
+
+
+def test_build_context_writes_on_flush(catalog_path):
+    with BuildContext() as context:
+        catalog = STACObject.from_file(catalog_path)
+        catalog["title"] = "Catalog"
+        catalog.save()
+        assert "title" not in read(catalog_path)
+
+        context.flush()
+        assert read(catalog_path)["title"] == "Catalog"
+
+
+def test_build_context_writes_on_exit(catalog_path):
+    with BuildContext():
+        catalog = STACObject.from_file(catalog_path)
+        catalog["title"] = "Catalog"
+        catalog.save()
+        assert "title" not in read(catalog_path)
+
+    assert read(catalog_path)["title"] == "Catalog"
+
+
+def test_build_context_discards_on_error(catalog_path):
+    with pytest.raises(RuntimeError):
+        with BuildContext():
+            catalog = STACObject.from_file(catalog_path)
+            catalog["title"] = "Catalog"
+            catalog.save()
+            raise RuntimeError()
+
+    assert "title" not in read(catalog_path)
+
+
+@pytest.mark.parametrize(
+    "href, expected",
+    [
+        ("./catalog.json", False),
+        ("../x.json?u=http://y", False),
+        ("/abs/catalog.json", False),
+        ("file:///abs/catalog.json", False),
+        ("FILE://x", False),
+        ("https://example.com/catalog.json", True),
+        ("s3:bucket", True),
+        (" http://example.com", True),
+    ],
+)
+def test_is_remote_href(href, expected):
+    assert is_remote_href(href) == expected
+    # same as the urlparse check it replaces
+    assert is_remote_href(href) == (
+        urlparse(href).scheme not in ("", "file")
+    )
+
+
+@pytest.mark.parametrize(
+    "href",
+    [
+        "catalog.json",
+        "./catalog.json",
+        "../catalog.json",
+        "/abs/catalog.json",
+        "\\abs\\catalog.json",
+        "C:\\x\\catalog.json",
+        "http://example.com/catalog.json",
+        " http://example.com/catalog.json",
+        " /abs/catalog.json",
+        " catalog.json",
+        "",
+    ],
+)
+def test_is_absolute_href(href):
+    # the shortcut must give the same result as the urlparse check
+    parsed = urlparse(href)
+    expected = parsed.scheme != "" or os.path.isabs(parsed.path)
+    assert is_absolute_href(href) == expected
+
+
+def test_is_absolute_href_values():
+    assert not is_absolute_href("./catalog.json")
+    assert is_absolute_href("/abs/catalog.json")
+    assert is_absolute_href("http://example.com/catalog.json")
+    # urlparse strips the leading whitespace
+    assert is_absolute_href(" http://example.com/catalog.json")
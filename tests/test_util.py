@@ -0,0 +1,29 @@
+import errno
+
+from osc_builder import util
+
+
+class FailingFcntl:
+    def __init__(self):
+        self.calls = 0
+
+    def ioctl(self, fd, request, arg):
+        self.calls += 1
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+
+def test_clone_file_falls_back_to_copy(tmp_path, monkeypatch):
+    fcntl = FailingFcntl()
+    monkeypatch.setattr(util, "fcntl", fcntl)
+    monkeypatch.setattr(util, "_reflink_supported", True)
+
+    for name in ("a.json", "b.json"):
+        src = tmp_path / name
+        src.write_text(f'{{"id": "{name}"}}')
+        dst = tmp_path / f"copy-{name}"
+
+        assert util.clone_file(str(src), str(dst)) == str(dst)
+        assert dst.read_text() == src.read_text()
+
+    # the clone is only attempted for the first file
+    assert fcntl.calls == 1